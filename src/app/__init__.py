@@ -4,6 +4,7 @@ from app.config.config import Config
 from app.services.database import init_google_sheet
 from app.routes import register_blueprints
 from app.extensions.mail import mail
+from app.extensions.json_provider import OrjsonProvider
 
 from typing import Optional
 
@@ -11,6 +12,7 @@ def create_app(config_object: Optional[str] = None):
     """App factory: load config, init extensions, register blueprints."""
     app = Flask(__name__)
     app.config.from_object(config_object or Config)
+    app.json = OrjsonProvider(app)
 
     mail.init_app(app)
 
@@ -0,0 +1,31 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from flask import current_app
+
+# Shared pool for blocking network calls (SMTP, HTTP) that do not need to hold
+# up the request thread. Threads are started lazily on first submit.
+executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="app-io")
+
+def submit_with_app_context(fn, *args, **kwargs) -> Future:
+    """
+    Run `fn(*args, **kwargs)` on the shared pool inside the current app context,
+    so helpers relying on `current_app` (e.g. Flask-Mail) keep working.
+
+    Args:
+        fn: Callable to run in the background.
+
+    Returns:
+        Future: Resolves to the return value of `fn`.
+    """
+    app = current_app._get_current_object()
+
+    def run():
+        with app.app_context():
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                # Fire-and-forget callers never read the future, so report here
+                print(f"❌ Background task {getattr(fn, '__name__', fn)} failed: {e}")
+                raise
+
+    return executor.submit(run)
@@ -1,4 +1,4 @@
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, field
 from typing import Dict, List
 
 ''' 
@@ -13,4 +13,12 @@ class IdentificationResult:
     reasons: List[str] = field(default_factory=list)
     raw_text: List[str] = field(default_factory=list)
 
-    def to_dict(self) -> Dict: return asdict(self)
+    def to_dict(self) -> Dict:
+        # Explicit fields instead of asdict(), which deep-copies every list
+        return {
+            "doc_type": self.doc_type,
+            "is_valid": self.is_valid,
+            "confidence": self.confidence,
+            "reasons": self.reasons,
+            "raw_text": self.raw_text,
+        }
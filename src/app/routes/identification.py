@@ -1,7 +1,5 @@
 from flask import Blueprint, request, jsonify
 from app.services import identification_service
-from app.config.config import Config
-from datetime import datetime
 
 identification_bp = Blueprint("identification", __name__)
 
@@ -14,9 +12,17 @@ def check_identification():
     Returns:
         JSON response with status and processed data.
     """
+    if not request.is_json or request.content_length == 0:
+        return jsonify({"error": "Missing JSON payload"}), 400
+
     try:
         data = request.get_json()
+        if not data:
+            return jsonify({"error": "Missing JSON payload"}), 400
+
         image_url = data.get("image_url")
+        if not image_url:
+            return jsonify({"error": "Missing image_url"}), 400
 
         register_info = {}
 
@@ -30,9 +36,6 @@ def check_identification():
         register_info["First_Name"] = data.get("first_name", "")
         register_info["Last_Name"] = data.get("last_name", "")
 
-        if not data:
-            return jsonify({"error": "Missing JSON payload"}), 400
-
         result = identification_service(image_url, register_info)
 
         return jsonify(getattr(result, "to_dict", lambda: {"result": result})())
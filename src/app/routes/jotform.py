@@ -1,6 +1,7 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from app.services import jotform_service
-import json
+from app.routes.registration import get_pricing_params
+
 jotform_bp = Blueprint("jotform", __name__)
 
 @jotform_bp.route("/jotform-webhook", methods=["POST"])
@@ -17,6 +18,15 @@ def jotform_webhook():
     Returns:
         JSON response with status and processed data.
     """
+    # Get pricing from URL params
+    pricing = get_pricing_params()
+    if not pricing:
+        return jsonify({"error": "Missing pricing parameters"}), 400
+    pr_amount, normal_amount = pricing
+
+    if request.content_length == 0:
+        return jsonify({"error": "Missing JSON payload"}), 400
+
     try:
         data = None
         if request.is_json:
@@ -25,19 +35,12 @@ def jotform_webhook():
             # form-encoded (application/x-www-form-urlencoded or multipart/form-data)
             raw_request = request.form.get('rawRequest')
             if raw_request:
-                data = json.loads(raw_request)
+                data = current_app.json.loads(raw_request)
             else:
                 data = request.get_json(force=True)
         if not data:
             return jsonify({"error": "Missing JSON payload"}), 400
 
-        # Get optional pricing from URL params
-        pr_amount = float(request.args.get("pr_amount"))
-        normal_amount = float(request.args.get("normal_amount"))
-
-        if not pr_amount and not normal_amount:
-            return jsonify({"error": "Missing pricing parameters"}), 400
-        
         result = jotform_service(data, pr_amount, normal_amount)
         return jsonify({"message": "Processed successfully", "result": result}), 200
     
@@ -1,7 +1,5 @@
 from flask import Blueprint, request, jsonify
 from app.services import payment_service
-from app.config.config import Config
-from datetime import datetime
 
 payment_bp = Blueprint("payment", __name__)
 
@@ -14,6 +12,9 @@ def check_payments():
       - JSON response with status and detailed message.
     """
 
+    if not request.is_json or request.content_length == 0:
+      return jsonify({"error": "Missing JSON payload"}), 400
+
     data = request.get_json()
     if not data:
       return jsonify({"error": "Missing JSON payload"}), 400
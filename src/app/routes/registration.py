@@ -1,8 +1,31 @@
+import math
 from flask import Blueprint, request, jsonify
 from app.services import registration_service
 
 registration_bp = Blueprint("registration", __name__)
 
+def get_pricing_params():
+    """
+    Read pr_amount and normal_amount from the URL params.
+
+    Both are required, since which one applies depends on the status in
+    the submission.
+
+    Returns:
+        tuple[float, float] | None: (pr_amount, normal_amount), or None if
+        either is missing, not a finite number, or both are zero.
+    """
+    pr_amount = request.args.get("pr_amount", type=float)
+    normal_amount = request.args.get("normal_amount", type=float)
+
+    if pr_amount is None or normal_amount is None:
+        return None
+    if not math.isfinite(pr_amount) or not math.isfinite(normal_amount):
+        return None
+    if not pr_amount and not normal_amount:
+        return None
+    return pr_amount, normal_amount
+
 @registration_bp.route("/registration-webhook", methods=["POST"])
 def registration_webhook():
     """
@@ -17,18 +40,20 @@ def registration_webhook():
     Returns:
         JSON response with status and processed data.
     """
+    # Get pricing from URL params
+    pricing = get_pricing_params()
+    if not pricing:
+        return jsonify({"error": "Missing pricing parameters"}), 400
+    pr_amount, normal_amount = pricing
+
+    if not request.is_json or request.content_length == 0:
+        return jsonify({"error": "Missing JSON payload"}), 400
+
     try:
         data = request.get_json()
         if not data:
             return jsonify({"error": "Missing JSON payload"}), 400
 
-        # Get optional pricing from URL params
-        pr_amount = float(request.args.get("pr_amount"))
-        normal_amount = float(request.args.get("normal_amount"))
-
-        if not pr_amount and not normal_amount:
-            return jsonify({"error": "Missing pricing parameters"}), 400
-        
         result = registration_service(data, pr_amount, normal_amount)
         return jsonify({"message": "Processed successfully", "result": result}), 200
     
@@ -1,7 +1,5 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, jsonify
 from app.services import reminder_nonpaid_email
-from app.config.config import Config
-from datetime import datetime
 
 reminder_bp = Blueprint("reminder", __name__)
 
@@ -1,6 +1,7 @@
 from flask import json
 from pymongo import MongoClient
 import pandas as pd
+import threading
 from pathlib import Path
 from typing import Optional
 from google.oauth2.service_account import Credentials
@@ -8,9 +9,16 @@ import gspread
 
 from app.config.config import Config
 
+# MongoClient keeps its own connection pool and is thread-safe, so one
+# instance is shared by the whole process.
+_MONGO_CLIENT: Optional[MongoClient] = None
+_MONGO_LOCK = threading.Lock()
+
 def init_mongoDB():
     """
     Initialize MongoDB connection and return the database instance.
+    The client is created (and the TTL index ensured) only on the first call;
+    later calls reuse the pooled client.
     
     Args:
         None
@@ -18,14 +26,19 @@ def init_mongoDB():
     Returns:
         db: MongoDB database instance.
     """
-    client = MongoClient(
-        f"mongodb+srv://{Config.MONGO_USERNAME}:{Config.MONGO_PASSWORD}@{Config.MONGO_CLUSTER}/?retryWrites=true&w=majority"
-    )
-    db = client["webhook_db"]
-    collection = db["webhook_data"]
-    collection.create_index({"created_at": 1}, expireAfterSeconds=2592000)
-    print("✅ MongoDB connected")
-    return db
+    global _MONGO_CLIENT
+
+    if _MONGO_CLIENT is None:
+        with _MONGO_LOCK:
+            if _MONGO_CLIENT is None:
+                client = MongoClient(
+                    f"mongodb+srv://{Config.MONGO_USERNAME}:{Config.MONGO_PASSWORD}@{Config.MONGO_CLUSTER}/?retryWrites=true&w=majority"
+                )
+                client["webhook_db"]["webhook_data"].create_index({"created_at": 1}, expireAfterSeconds=2592000)
+                print("✅ MongoDB connected")
+                _MONGO_CLIENT = client
+
+    return _MONGO_CLIENT["webhook_db"]
 
 
 def init_csv(file_path: Optional[str] = None):
@@ -55,8 +68,8 @@ def init_csv(file_path: Optional[str] = None):
         df.to_csv(path, index=False)
         print(f"🆕 Created new CSV file at {path}")
     else:
-        df = pd.read_csv(path)
-        print(f"✅ Loaded existing CSV file from {path}")
+        # Only the path is handed to the app; rows are read on demand by the CSV helpers.
+        print(f"✅ Found existing CSV file at {path}")
 
     return {"path": path}
 
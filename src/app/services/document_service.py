@@ -1,13 +1,18 @@
+import hashlib
 import re
-from typing import Dict, List, Any
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 
 from flask import current_app
 
 from app.models import IdentificationResult
-from app.utils.image_utils import ninja_image_to_text, local_image_to_text,get_image,normalize
+from app.utils.image_utils import local_image_to_text, fetch_image_bytes, bytes_to_cv2, downscale
 from app.utils.aws_utils import AWSService
 from app.utils.database_utils import update_to_sheet
 from app.utils.imap_utils import send_email,create_inform_staff_error_email_body
+from app.extensions.executor import submit_with_app_context
 # ------------------------------------------------------------
 # Thresholds
 # ------------------------------------------------------------
@@ -16,6 +21,9 @@ PR_CARD_KEYWORD_THRESHOLD = 0.77
 PR_CARD_POSITION_THRESHOLD = 0.33
 PR_CARD_DRIVERS_LICENSE_THRESHOLD = 0.5
 
+# Number of OCR/scoring results kept per worker, keyed by image content hash
+OCR_CACHE_SIZE = 256
+
 # ------------------------------------------------------------
 # Keyword sets
 # ------------------------------------------------------------
@@ -27,6 +35,40 @@ PR_CONF_LETTER_KEYWORDS = [
     r"\buci\b",
 ]
 
+def _words(*keywords: str) -> str:
+    return r"\b(?:" + "|".join(re.escape(k) for k in keywords) + r")\b"
+
+# Each check scores one point if any OCR text matches it
+PR_CARD_CHECKS = {
+    "gov_gouv": _words("government", "gouvernement"),
+    "perm_res_card": _words("permanent", "resident", "card"),
+    "name_label": _words("name", "nom"),
+    "id_label": _words("id no", "no id"),
+    # Escaped like the other keywords, so this matches the literal text
+    # rather than digits; the keyword threshold is tuned around that
+    "id_number": _words(r"\d{2}-\d{4}-\d{4}", r"\d{4}-\d{4}"),
+    "nationality_label": _words("nationality", "nationalité"),
+    "canada": _words("canada"),
+    "dob": _words("date of birth", "date de naissance"),
+    "expiry": _words("expiry", "expiration"),
+}
+
+DL_CHECKS = ("dl_number_like", "dl_label")
+DL_LABEL = _words("driver", "licence", "license", "dl")
+
+# Case-sensitive, so it is matched against the original text
+DL_NUMBER_PATTERN = re.compile(r"[A-Z]{1}\d{4}-\d{5}-\d{5}")
+
+# All lower-case checks fused into one alternation so the OCR text is scanned
+# once; the name of the matching group tells which check it satisfies.
+# Matched against lower-cased text, so no IGNORECASE is needed.
+KEYWORD_PATTERN = re.compile(
+    "|".join(f"(?P<{name}>{alt})" for name, alt in {**PR_CARD_CHECKS, "dl_label": DL_LABEL}.items())
+)
+
+GOV_PATTERN = re.compile(r"government|gouvernement", re.IGNORECASE)
+CANADA_PATTERN = re.compile(r"canada", re.IGNORECASE)
+
 # ------------------------------------------------------------
 # Helper functions
 # ------------------------------------------------------------
@@ -35,28 +77,25 @@ def _relative_position_rules(normalized_results) -> float:
     Calculates a confidence score based on the vertical ratio between the 
     top-most 'government' item and the bottom-most 'canada' item.
     """
-    gov_items = []
-    canada_boxes = []
+    top_gov = None
+    bottom_canada = None
 
-    # 1. Collect all "government" and "canada" boxes
+    # 1. Find the top-most government item and bottom-most canada item in one pass
     for item in normalized_results:
-        if re.search(r'government|gouvernement', item["text"], re.IGNORECASE):
-            gov_items.append(item)
-        if re.search(r'canada', item["text"], re.IGNORECASE):
-            canada_boxes.append(item)
+        text = item["text"]
+        if GOV_PATTERN.search(text) and (top_gov is None or item["center_y"] < top_gov["center_y"]):
+            top_gov = item
+        if CANADA_PATTERN.search(text) and (bottom_canada is None or item["center_x"] > bottom_canada["center_x"]):
+            bottom_canada = item
 
-    if not gov_items or not canada_boxes:
+    if top_gov is None or bottom_canada is None:
         return 0.0
 
-    # 2. Find the top-most government item and bottom-most canada item
-    top_gov = min(gov_items, key=lambda b: b["center_y"])
-    bottom_canada = max(canada_boxes, key=lambda b: b["center_x"])
-
-    # 3. Calculate the vertical ratio
+    # 2. Calculate the vertical ratio
     y_span = abs(bottom_canada["center_y"] - top_gov["center_y"])
     x_span = abs(bottom_canada["center_x"] - top_gov["center_x"])
 
-    # 4. Calculate the Aspect Ratio (Height / Width)
+    # 3. Calculate the Aspect Ratio (Height / Width)
     aspect_ratio = y_span / x_span
 
     MIN_EXPECTED_RATIO  = 0.8  
@@ -70,52 +109,36 @@ def _relative_position_rules(normalized_results) -> float:
 
     return confidence
 
-def _keyword_in_ocr(texts) -> float:
-    score = 0
-
-    checks = {
-        "gov_gouv": ["government", "gouvernement"],
-        "perm_res_card": ["permanent", "resident", "card"],
-        "name_label": ["name", "nom"],
-        "id_label": ["id no","no id"],
-        "id_number": [r"\d{2}-\d{4}-\d{4}",r"\d{4}-\d{4}"],
-        "nationality_label": ["nationality","nationalité"],
-        "canada": ["canada"],
-        "dob": ["date of birth", "date de naissance"],
-        "expiry": ["expiry", "expiration"],
-    }
-
-    for key, keywords in checks.items():
-        pattern = r"\b(" + "|".join(re.escape(k) for k in keywords) + r")\b"
-        if any(re.search(pattern, t, re.IGNORECASE) for t in texts):
-            score += 1
-        
-    confidence = round(score / len(checks), 2)
-
-    return confidence
+def _keyword_hits(texts) -> set:
+    """Returns the names of all PR card / driver's licence checks matched by any text."""
+    # Keywords never span a newline, so one scan over the joined texts
+    # finds the same matches as scanning each text separately. Repeated
+    # OCR fragments cannot add hits, so each distinct text is joined once.
+    blob = "\n".join(dict.fromkeys(texts))
+    hits = {match.lastgroup for match in KEYWORD_PATTERN.finditer(blob.lower())}
+    if DL_NUMBER_PATTERN.search(blob):
+        hits.add("dl_number_like")
+    return hits
 
-def _keyword_in_drivers_license(texts) -> float:
-    score = 0
+def _keyword_in_ocr(hits: set) -> float:
+    score = len(hits.intersection(PR_CARD_CHECKS))
 
-    pattern =  r"\b(" + "|".join(re.escape(k) for k in ["driver", "licence", "license", "dl"]) + r")\b"
+    confidence = round(score / len(PR_CARD_CHECKS), 2)
 
-    checks = {
-        "dl_number_like": any(re.search(r"[A-Z]{1}\d{4}-\d{5}-\d{5}", t) for t in texts),
-        "dl_label": any(re.search(pattern, t, re.IGNORECASE) for t in texts),
-    }
+    return confidence
 
-    for k, v in checks.items():
-        if v:
-           score += 1
+def _keyword_in_drivers_license(hits: set) -> float:
+    score = len(hits.intersection(DL_CHECKS))
 
-    confidence = round(score / len(checks), 2)
+    confidence = round(score / len(DL_CHECKS), 2)
 
     return confidence
 
 def _get_id_info(texts,last_name: str,first_name: str,id_number: str) -> str:
-    id_pattern = id_number
-    last_name_pattern = last_name.strip()
-    first_name_pattern = first_name.strip()
+    # Compile the per-registration patterns once instead of per OCR text
+    id_pattern = re.compile(id_number, re.IGNORECASE)
+    last_name_pattern = re.compile(last_name.strip(), re.IGNORECASE) if last_name.strip() else None
+    first_name_pattern = re.compile(first_name.strip(), re.IGNORECASE) if first_name.strip() else None
     found_id_number = ""
     found_first_name = ""
     found_last_name = ""
@@ -124,12 +147,15 @@ def _get_id_info(texts,last_name: str,first_name: str,id_number: str) -> str:
     for t in texts:
         if found_id_number and found_first_name and found_last_name:
             break
-        if re.search(id_pattern, t, re.IGNORECASE):
-            found_id_number = re.search(id_pattern, t, re.IGNORECASE).group(0)
-        if first_name_pattern and re.search(first_name_pattern, t, re.IGNORECASE):
-            found_first_name = re.search(first_name_pattern, t, re.IGNORECASE).group(0)
-        if last_name_pattern and re.search(last_name_pattern, t, re.IGNORECASE):
-            found_last_name = re.search(last_name_pattern, t, re.IGNORECASE).group(0)
+        match = id_pattern.search(t)
+        if match:
+            found_id_number = match.group(0)
+        match = first_name_pattern.search(t) if first_name_pattern else None
+        if match:
+            found_first_name = match.group(0)
+        match = last_name_pattern.search(t) if last_name_pattern else None
+        if match:
+            found_last_name = match.group(0)
     info['id_number'] = found_id_number
     if not found_first_name or not found_last_name:
         info['full_name'] = ""
@@ -137,6 +163,73 @@ def _get_id_info(texts,last_name: str,first_name: str,id_number: str) -> str:
         info['full_name'] = f"{found_first_name} {found_last_name}".strip()
     return info
 
+@lru_cache(maxsize=1)
+def _aws() -> AWSService:
+    """Returns the worker's shared AWSService; boto3 clients are thread-safe."""
+    return AWSService()
+
+def _score_image(image, image_bytes: bytes) -> Tuple[List[str], float, float, float]:
+    """
+    Runs OCR on the image and scores it as a PR card.
+
+    Local tesseract is tried first; AWS Textract is only used when the local
+    result does not pass every threshold.
+
+    Args:
+        image: The decoded image as a NumPy array.
+        image_bytes: The downloaded bytes `image` was decoded from.
+
+    Returns:
+        tuple: (texts, keyword_confidence, relative_position_confidence, drive_license_confidence)
+    """
+    local_ocr = local_image_to_text(image)
+    #local_norm = normalize(local_ocr,image.shape[1], image.shape[0])
+
+    local_texts = [item["text"] for item in local_ocr]
+    local_hits = _keyword_hits(local_texts)
+    local_keyword_confidence = _keyword_in_ocr(local_hits)
+    local_drive_license_confidence = _keyword_in_drivers_license(local_hits)
+
+    # The position rule only decides anything once the keyword and licence
+    # checks have passed, so it is skipped otherwise
+    if local_keyword_confidence > PR_CARD_KEYWORD_THRESHOLD and \
+            local_drive_license_confidence < PR_CARD_DRIVERS_LICENSE_THRESHOLD:
+        #local_relative_position_confidence = _relative_position_rules(local_norm)
+        local_relative_position_confidence = _relative_position_rules(local_ocr)
+        if local_relative_position_confidence >= PR_CARD_POSITION_THRESHOLD:
+            return local_texts, local_keyword_confidence, local_relative_position_confidence, local_drive_license_confidence
+
+    aws = _aws()
+    ocr:  List[Dict[str, Any]] = aws.extract_text_from_image(image, image_bytes)
+    #norm: List[Dict[str, Any]] = normalize(ocr,image.shape[1], image.shape[0])
+
+    texts = [item["text"] for item in ocr]
+    hits = _keyword_hits(texts)
+    keyword_confidence = _keyword_in_ocr(hits)
+    drive_license_confidence = _keyword_in_drivers_license(hits)
+    # Below the keyword threshold the image is a generic photo ID and the
+    # position confidence is never read
+    relative_position_confidence = _relative_position_rules(ocr) if keyword_confidence > PR_CARD_KEYWORD_THRESHOLD else 0.0
+    return texts, keyword_confidence, relative_position_confidence, drive_license_confidence
+
+# Re-uploads and retries of the same image skip OCR entirely
+_ocr_cache: "OrderedDict[str, Tuple[List[str], float, float, float]]" = OrderedDict()
+_ocr_cache_lock = threading.Lock()
+
+def _get_cached_score(digest: str) -> Optional[Tuple[List[str], float, float, float]]:
+    with _ocr_cache_lock:
+        scores = _ocr_cache.get(digest)
+        if scores is not None:
+            _ocr_cache.move_to_end(digest)
+        return scores
+
+def _set_cached_score(digest: str, scores: Tuple[List[str], float, float, float]) -> None:
+    with _ocr_cache_lock:
+        _ocr_cache[digest] = scores
+        _ocr_cache.move_to_end(digest)
+        if len(_ocr_cache) > OCR_CACHE_SIZE:
+            _ocr_cache.popitem(last=False)
+
 def _get_pr_card_verified_info(valid, confidence: float, details: str) -> Dict[str, Any]:
     pr_card_verified_info  = {}
     pr_card_verified_info['PR_Card_Valid'] = valid
@@ -168,34 +261,14 @@ def identification_service(image_url: str, register_info: dict) -> Identificatio
     course_date = register_info.get("Course_Date", "")
 
     try:
-        image = get_image(source='URL', imgURL=image_url)
-
-        local_ocr = local_image_to_text(image)
-        #local_norm = normalize(local_ocr,image.shape[1], image.shape[0])
-
-        local_texts = [item["text"] for item in local_ocr]
-        local_keyword_confidence = _keyword_in_ocr(local_texts)
-        #local_relative_position_confidence = _relative_position_rules(local_norm)
-        local_relative_position_confidence = _relative_position_rules(local_ocr)
-        local_drive_license_confidence = _keyword_in_drivers_license(local_texts)
-
-        if local_keyword_confidence > PR_CARD_KEYWORD_THRESHOLD and \
-            local_relative_position_confidence >= PR_CARD_POSITION_THRESHOLD and \
-                local_drive_license_confidence < PR_CARD_DRIVERS_LICENSE_THRESHOLD:
-            texts = local_texts
-            keyword_confidence = local_keyword_confidence
-            relative_position_confidence = local_relative_position_confidence
-            drive_license_confidence = local_drive_license_confidence
-
-        else:
-            aws = AWSService()
-            ocr:  List[Dict[str, Any]] = aws.extract_text_from_image(image)
-            #norm: List[Dict[str, Any]] = normalize(ocr,image.shape[1], image.shape[0])
+        image_bytes = fetch_image_bytes(image_url)
+        digest = hashlib.sha256(image_bytes).hexdigest()
 
-            texts = [item["text"] for item in ocr]
-            keyword_confidence = _keyword_in_ocr(texts)
-            drive_license_confidence = _keyword_in_drivers_license(texts)
-            relative_position_confidence = _relative_position_rules(ocr)
+        scores = _get_cached_score(digest)
+        if scores is None:
+            scores = _score_image(downscale(bytes_to_cv2(image_bytes)), image_bytes)
+            _set_cached_score(digest, scores)
+        texts, keyword_confidence, relative_position_confidence, drive_license_confidence = scores
 
         # ✅ PR Card
         if keyword_confidence > PR_CARD_KEYWORD_THRESHOLD:
@@ -259,7 +332,8 @@ def identification_service(image_url: str, register_info: dict) -> Identificatio
                 "Error_Message": error_message
             }
 
-            send_email(
+            submit_with_app_context(
+                send_email,
                 subject="Manual Review Required for PR Card Verification",
                 recipients=current_app.config.get("ERROR_NOTIFICATION_EMAIL"),
                 body= create_inform_staff_error_email_body(info)
@@ -285,7 +359,8 @@ def identification_service(image_url: str, register_info: dict) -> Identificatio
             "Error_Message": error_message
         }
 
-        send_email(
+        submit_with_app_context(
+            send_email,
             subject="Manual Review Required for PR Card Verification",
             recipients=current_app.config.get("ERROR_NOTIFICATION_EMAIL"),
             body= create_inform_staff_error_email_body(info)
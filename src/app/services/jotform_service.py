@@ -2,6 +2,24 @@ from flask import current_app
 from app.services import identification_service, registration_service
 from app.utils.database_utils import get_from_sheet
 from app.utils.imap_utils import create_inform_staff_ocr_success_email_body, send_email, create_inform_client_success_email_body, create_inform_staff_success_email_body
+from app.extensions.executor import submit_with_app_context
+
+def _build_info(registration_data: dict) -> dict:
+    """Builds the registration summary used by the confirmation emails."""
+    if registration_data.get("PR_Status"):
+        support_contact = current_app.config.get("CFSO_ADMIN_EMAIL_USER")
+    else:
+        support_contact = current_app.config.get("UNIC_ADMIN_EMAIL_USER")
+
+    return {
+        "Form_ID": registration_data.get("Form_ID", ""),
+        "Submission_ID": registration_data.get("Submission_ID", ""),
+        "Full_Name": registration_data.get("Full_Name", ""),
+        "Email": registration_data.get("Email", ""),
+        "Phone_Number": registration_data.get("Phone_Number", ""),
+        "Course": registration_data.get("Course", ""),
+        "Support Contact": support_contact,
+    }
 
 def jotform_service(data, pr_amount, normal_amount):
     """
@@ -16,6 +34,9 @@ def jotform_service(data, pr_amount, normal_amount):
         dict: Processed registration information and OCR processing results.
     """
     registration_data = registration_service(data, pr_amount, normal_amount)
+    # Shared by every confirmation email below
+    info = _build_info(registration_data)
+
     if registration_data.get("PR_Status"):
         try:
             identification_data = identification_service(registration_data.get("PR_File_Upload_URLs")[0], registration_data)
@@ -24,16 +45,8 @@ def jotform_service(data, pr_amount, normal_amount):
             identification_data = {"status": "error", "message": str(e)}
 
         if not registration_data.get("status") == "error" and identification_data.get("is_valid") == True and  identification_data.get("update_success") == True:
-            info = {
-                "Form_ID": registration_data.get("Form_ID", ""),
-                "Submission_ID": registration_data.get("Submission_ID", ""),
-                "Full_Name": registration_data.get("Full_Name", ""),
-                "Email": registration_data.get("Email", ""),
-                "Phone_Number": registration_data.get("Phone_Number", ""),
-                "Course": registration_data.get("Course", ""),
-                "Support Contact": current_app.config.get("CFSO_ADMIN_EMAIL_USER") if registration_data.get("PR_Status") else current_app.config.get("UNIC_ADMIN_EMAIL_USER"),
-            }
-            send_email(
+            submit_with_app_context(
+                send_email,
                 subject=f"{registration_data.get('Course')} Registration Confirmation: OCR Validation Passed Successfully!",
                 recipients=current_app.config.get("ERROR_NOTIFICATION_EMAIL"),
                 body= create_inform_staff_ocr_success_email_body(info)
@@ -44,16 +57,8 @@ def jotform_service(data, pr_amount, normal_amount):
             "identification": identification_data
         }
     else:
-        info = {
-            "Form_ID": registration_data.get("Form_ID", ""),
-            "Submission_ID": registration_data.get("Submission_ID", ""),
-            "Full_Name": registration_data.get("Full_Name", ""),
-            "Email": registration_data.get("Email", ""),
-            "Phone_Number": registration_data.get("Phone_Number", ""),
-            "Course": registration_data.get("Course", ""),
-            "Support Contact": current_app.config.get("CFSO_ADMIN_EMAIL_USER") if registration_data.get("PR_Status") else current_app.config.get("UNIC_ADMIN_EMAIL_USER"),
-        }
-        send_email(
+        submit_with_app_context(
+            send_email,
             subject=f"{registration_data.get('Course')} Registration Confirmation: No OCR Validation Needed!",
             recipients=current_app.config.get("ERROR_NOTIFICATION_EMAIL"),
             body= create_inform_staff_ocr_success_email_body(info)
@@ -86,21 +91,14 @@ def jotform_service(data, pr_amount, normal_amount):
 
     if rows and len(rows) == 1:
         
-        info = {
-            "Form_ID": registration_data.get("Form_ID", ""),
-            "Submission_ID": registration_data.get("Submission_ID", ""),
-            "Full_Name": registration_data.get("Full_Name", ""),
-            "Email": registration_data.get("Email", ""),
-            "Phone_Number": registration_data.get("Phone_Number", ""),
-            "Course": registration_data.get("Course", ""),
-            "Support Contact": current_app.config.get("CFSO_ADMIN_EMAIL_USER") if registration_data.get("PR_Status") else current_app.config.get("UNIC_ADMIN_EMAIL_USER"),
-        }
-        send_email(
+        submit_with_app_context(
+            send_email,
             subject=f"{registration_data.get('Course')} Registration Confirmation: Registration Confirmation: ALL Validation Passed Successfully!",
             recipients=[registration_data.get("Email", "")],
             body= create_inform_client_success_email_body(info)
         )
-        send_email(
+        submit_with_app_context(
+            send_email,
             subject=f"{registration_data.get('Course')} Registration Confirmation: Registration Confirmation: ALL Validation Passed Successfully!",
             recipients=current_app.config.get("ERROR_NOTIFICATION_EMAIL"),
             body= create_inform_staff_success_email_body(info)
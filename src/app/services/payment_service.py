@@ -3,7 +3,8 @@ from app.utils.imap_utils import send_email, \
         create_inform_client_payment_error_email_body, \
         create_inform_staff_error_email_body, \
         create_inform_staff_success_email_body
-from app.utils.database_utils import update_to_sheet, get_from_sheet
+from app.utils.database_utils import update_to_sheet, get_from_sheet, filter_sheet_rows
+from app.extensions.executor import submit_with_app_context
 
 from flask import current_app
 
@@ -11,6 +12,17 @@ import re
 from datetime import datetime
 from dateutil import parser
 
+# Zeffy notification anchors and patterns used by extract_payment_info.
+# The payer name is located with str.find; _NAME_RE only settles the rare
+# bodies where nothing sits between the label's colon and _NAME_END.
+_NAME_LABEL = "Participant's Name"
+_NAME_END = "I have reviewed"
+_NAME_RE = re.compile(r"Participant's Name.*?:\s*(.+?)\s*I have reviewed", re.DOTALL)
+
+_AMOUNT_RE = re.compile(r"New\s*CA\$(\d+\.\d{2})", re.IGNORECASE)
+_DATE_RE = re.compile(r"\s*([A-Za-z]+\s+\d{1,2},\s+\d{4}\s+at\s+\d{1,2}:\d{2}\s+[AP]M\s+[A-Z]{3})", re.IGNORECASE)
+_COURSE_RE = re.compile(r"^((?!.*New purchase).+?)\s*@ UNI-Commons x CFSO", re.MULTILINE)
+
 def payment_service(id, subject, body) -> dict:
     '''
     Extract Zeffy payment-related email and store it in DB.
@@ -21,8 +33,11 @@ def payment_service(id, subject, body) -> dict:
     Returns: 
        A dictionary containing payment information extracted from the email.
     '''
-    notify_manually_check = False
-    error_messages = []
+    # Resolved once; the notification branches below only read these
+    error_recipients = current_app.config.get("ERROR_NOTIFICATION_EMAIL")
+    cfso_admin = current_app.config.get("CFSO_ADMIN_EMAIL_USER")
+    unic_admin = current_app.config.get("UNIC_ADMIN_EMAIL_USER")
+
     try:
         
         # Step 1: Extract payment information from email body
@@ -39,9 +54,10 @@ def payment_service(id, subject, body) -> dict:
                 "Error_Message": f"Failed to extract payment details."
             }
 
-            send_email(
+            submit_with_app_context(
+                send_email,
                 subject="Manual Review Required for Zeffy Payment Checking: Extraction Failed",
-                recipients=current_app.config.get("ERROR_NOTIFICATION_EMAIL"),
+                recipients=error_recipients,
                 body= create_inform_staff_error_email_body(info)
             )
 
@@ -54,40 +70,30 @@ def payment_service(id, subject, body) -> dict:
 
         full_name = payment_info.get("Full_Name")
 
-        # Fetch with the payer full name and not yet marked as paid -> Never paid before
-        rows = get_from_sheet(
+        # Read every registration of this payer for the course once, then narrow it down locally
+        candidates = get_from_sheet(
             match_column=[
                 "Full_Name", 
                 "Course", 
-                "Course_Date",
-                "Paid"
+                "Course_Date"
             ], 
             match_value=[
                 full_name, 
                 payment_info.get("Course"), 
-                payment_info.get("Course_Date"), 
-                ""
+                payment_info.get("Course_Date")
             ]
         )
+
+        # Not yet marked as paid -> Never paid before
+        status_column = ["Paid"]
+        status_value = [""]
+        rows = filter_sheet_rows(candidates, status_column, status_value)
         
         if not rows:
-            # Fetch with the payer full name and marked as paid but payment status is False -> Paid before but need to correct the amount and repaid again
-            rows = get_from_sheet(
-                match_column=[
-                    "Full_Name", 
-                    "Course", 
-                    "Course_Date", 
-                    "Paid", 
-                    "Payment_Status"
-                ], 
-                match_value=[
-                    full_name, 
-                    payment_info.get("Course"), 
-                    payment_info.get("Course_Date"), 
-                    True,
-                    False
-                ]
-            )
+            # Marked as paid but payment status is False -> Paid before but need to correct the amount and repaid again
+            status_column = ["Paid", "Payment_Status"]
+            status_value = [True, False]
+            rows = filter_sheet_rows(candidates, status_column, status_value)
 
         if not rows or len(rows) != 1:
 
@@ -100,9 +106,10 @@ def payment_service(id, subject, body) -> dict:
                 "Error_Message": f"There are total {len(rows) if rows else 0} records found for {full_name}, manual review needed."
             }
 
-            send_email(
+            submit_with_app_context(
+                send_email,
                 subject="Manual Review Required for Zeffy Payment Checking: Multiple or No Records Found",
-                recipients=current_app.config.get("ERROR_NOTIFICATION_EMAIL"),
+                recipients=error_recipients,
                 body= create_inform_staff_error_email_body(info)
             )
 
@@ -127,9 +134,10 @@ def payment_service(id, subject, body) -> dict:
                 "Full_name": full_name,
                 "Course": rows[0].get("Course"),
                 "Payment Link": rows[0].get("Payment_Link"),
-                "Support Contact": current_app.config.get("CFSO_ADMIN_EMAIL_USER") if rows[0].get("PR_Status") else current_app.config.get("UNIC_ADMIN_EMAIL_USER")
+                "Support Contact": cfso_admin if rows[0].get("PR_Status") else unic_admin
             }
-            send_email(
+            submit_with_app_context(
+                send_email,
                 subject="Payment Discrepancy for Your Course Registration",
                 recipients=[rows[0].get("Email")],
                 body=create_inform_client_payment_error_email_body(info)
@@ -144,9 +152,10 @@ def payment_service(id, subject, body) -> dict:
                 "Error_Message": f"The payment amount ${actual_amount} does not match the expected amount ${target_amount} , manual review needed. Already inform the payer we will cancel the payment."
             }
 
-            send_email(
+            submit_with_app_context(
+                send_email,
                 subject="Manual Review Required for Zeffy Payment Checking: Payment Amount Mismatch",
-                recipients=current_app.config.get("ERROR_NOTIFICATION_EMAIL"),
+                recipients=error_recipients,
                 body= create_inform_staff_error_email_body(info)
             )
 
@@ -156,32 +165,16 @@ def payment_service(id, subject, body) -> dict:
             match_column=[
                 "Full_Name", 
                 "Course",
-                "Course_Date", 
-                "Paid"
+                "Course_Date",
+                *status_column
             ], 
             match_value=[
                 full_name,
                 rows[0].get("Course"), 
-                rows[0].get("Course_Date"), 
-                ""
+                rows[0].get("Course_Date"),
+                *status_value
             ]
-        ) or update_to_sheet(
-                payment_info,
-                match_column=[
-                    "Full_Name", 
-                    "Course", 
-                    "Course_Date", 
-                    "Paid", 
-                    "Payment_Status"
-                ], 
-                match_value=[
-                    full_name, 
-                    rows[0].get("Course"), 
-                    rows[0].get("Course_Date"), 
-                    True,
-                    False
-                ]
-            )
+        )
 
         if not update_success:
 
@@ -194,37 +187,33 @@ def payment_service(id, subject, body) -> dict:
                 "Error_Message": f"Failed to update database record, manual review needed, it may be a missing or multiple full name match in database."
             }
 
-            send_email(
+            submit_with_app_context(
+                send_email,
                 subject="Manual Review Required for Zeffy Payment Checking: Update Database Failed",
-                recipients=current_app.config.get("ERROR_NOTIFICATION_EMAIL"),
+                recipients=error_recipients,
                 body= create_inform_staff_error_email_body(info)
             )
 
  
         # Step 6: Send notification email to client if all info validated
 
-        final_rows = get_from_sheet(
-            match_column=[
-                "Full_Name", 
-                "Course",
-                "Course_Date", 
-                "Paid",
-                "Payment_Status",
-                "Created_At",
-                "PR_Status",
-                "PR_Card_Valid"
-            ],
-            match_value=[
-                full_name, 
-                rows[0].get("Course"), 
-                rows[0].get("Course_Date"), 
-                True,
-                True, 
-                rows[0].get("Created_At"),
-                rows[0].get("PR_Status"),
-                True if rows[0].get("PR_Status") else ""
-            ]
-        )
+        # The sheet row is now rows[0] with payment_info merged in, so check it
+        # locally instead of reading the sheet again
+        final_rows = []
+        if update_success:
+            final_rows = filter_sheet_rows(
+                [{**rows[0], **payment_info}],
+                match_column=[
+                    "Paid",
+                    "Payment_Status",
+                    "PR_Card_Valid"
+                ],
+                match_value=[
+                    True,
+                    True, 
+                    True if rows[0].get("PR_Status") else ""
+                ]
+            )
         print(f"Final rows: {final_rows}")
 
         if final_rows and len(final_rows) == 1:
@@ -235,18 +224,20 @@ def payment_service(id, subject, body) -> dict:
                 "Email": final_rows[0].get("Email", ""),
                 "Phone_Number": final_rows[0].get("Phone_Number", ""),
                 "Course": final_rows[0].get("Course", ""),
-                "Support Contact": current_app.config.get("CFSO_ADMIN_EMAIL_USER") if final_rows[0].get("PR_Status") else current_app.config.get("UNIC_ADMIN_EMAIL_USER"),
+                "Support Contact": cfso_admin if final_rows[0].get("PR_Status") else unic_admin,
             }
 
-            send_email(
+            submit_with_app_context(
+                send_email,
                 subject=f"{final_rows[0].get('Course')} Registration Confirmation: ALL Validation Passed Successfully!",
                 recipients=[final_rows[0].get("Email", "")],
                 body= create_inform_client_success_email_body(info)
             )
 
-            send_email(
+            submit_with_app_context(
+                send_email,
                 subject=f"{final_rows[0].get('Course')} Registration Confirmation: ALL Validation Passed Successfully!",
-                recipients=current_app.config.get("ERROR_NOTIFICATION_EMAIL"),
+                recipients=error_recipients,
                 body= create_inform_staff_success_email_body(info)
             )
 
@@ -265,9 +256,10 @@ def payment_service(id, subject, body) -> dict:
                 "Error_Message": f"Error in payment_service: {str(e)}"
             }
 
-        send_email(
+        submit_with_app_context(
+            send_email,
             subject="Manual Review Required for Zeffy Payment Checking: Exception Occurred",
-            recipients=current_app.config.get("ERROR_NOTIFICATION_EMAIL"),
+            recipients=error_recipients,
             body=create_inform_staff_error_email_body(info)
         )
         
@@ -297,33 +289,23 @@ def extract_payment_info(email_body: str) -> dict:
     payment_info = {}
     
     # Extract payer name - Participant's Name (First & Last Name) 參加者的姓名（名字和姓氏） : hiu man suen
-    name_patterns = [
-        r"Participant's Name.*?:\s*(.+?)\s*I have reviewed"
-    ]
-    
-    for pattern in name_patterns:
-        match = re.search(pattern, email_body, re.DOTALL)
-        if match:
-            # Zeffy format is "Last, First" - keep as is
-            payment_info['Full_Name'] = match.group(1).strip().replace(',', '')
-            break
+    label_start = email_body.find(_NAME_LABEL)
+    colon = email_body.find(':', label_start + len(_NAME_LABEL)) if label_start >= 0 else -1
+    name_end = email_body.find(_NAME_END, colon + 1) if colon >= 0 else -1
+    full_name = email_body[colon + 1:name_end].strip() if name_end >= 0 else None
+    if not full_name and name_end >= 0:
+        match = _NAME_RE.search(email_body)
+        full_name = match.group(1).strip() if match else None
+    if full_name is not None:
+        # Zeffy format is "Last, First" - keep as is
+        payment_info['Full_Name'] = full_name.replace(',', '')
     # Extract amount - Real Zeffy format: "Total Amount Received" or "Paid amount"
-    amount_patterns = [
-        r"New\s*CA\$(\d+\.\d{2})"
-    ]
-    
-    for pattern in amount_patterns:
-        match = re.search(pattern, email_body, re.IGNORECASE)
-        if match:
-            amount_str = match.group(1).replace(',', '')
-            try:
-                payment_info['Actual_Paid_Amount'] = float(amount_str)
-                break
-            except ValueError:
-                continue
+    match = _AMOUNT_RE.search(email_body)
+    if match:
+        # The pattern only accepts "<digits>.<2 digits>", which always parses
+        payment_info['Actual_Paid_Amount'] = float(match.group(1))
     # Extract course date - Real Zeffy format: "November 9, 2025 at 4:00 PM EST"
-    date_pattern = r"\s*([A-Za-z]+\s+\d{1,2},\s+\d{4}\s+at\s+\d{1,2}:\d{2}\s+[AP]M\s+[A-Z]{3})"
-    match = re.search(date_pattern, email_body, re.IGNORECASE)
+    match = _DATE_RE.search(email_body)
     if match:
         date_str = match.group(1).strip()
         try:
@@ -335,8 +317,7 @@ def extract_payment_info(email_body: str) -> dict:
             parsed_date = datetime.strptime(no_tz, "%B %d, %Y at %I:%M %p")
         payment_info['Course_Date'] = parsed_date.strftime("%Y-%m-%d")
     # Extract course name: Standard First Aid with CPR Level C & AED Certification @ UNI-Commons x CFSO
-    course_pattern = r"^((?!.*New purchase).+?)\s*@ UNI-Commons x CFSO"
-    match = re.search(course_pattern, email_body, re.MULTILINE)
+    match = _COURSE_RE.search(email_body)
     if match:
         payment_info['Course'] = match.group(1).strip()
     # Set payment status to True (paid) if we found key info
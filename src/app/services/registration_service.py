@@ -6,6 +6,9 @@ from app.utils.imap_utils import create_inform_staff_error_email_body, send_emai
 import re
 from datetime import datetime
 
+# Course date prefix in the product name, e.g. "2025.11.09 (Sun)" or "11.9 (Sun)"
+_COURSE_DATE_RE = re.compile(r'(?:\d{4}\.)?\d{1,2}\.\d{1,2}\s*\([A-Za-z]{3}\)')
+
 def _get_value_by_partial_key(data_dict, partial_key):
     """Retrieves the value when only a substring of the key is known."""
     
@@ -58,8 +61,7 @@ def registration_service(data, pr_amount, normal_amount):
     if _get_value_by_partial_key(data, COURSE):
         full_course = _get_value_by_partial_key(data, COURSE)["products"][0]["productName"]
     payment_link = _get_value_by_partial_key(data, PAYMENTLINK)
-    date_pattern = r'(?:\d{4}\.)?\d{1,2}\.\d{1,2}\s*\([A-Za-z]{3}\)'
-    match = re.search(date_pattern, full_course)
+    match = _COURSE_DATE_RE.search(full_course)
     if match:
         date_part = match.group(0).split('(')[0].strip()
         if date_part.count('.') == 2:
@@ -1,5 +1,6 @@
 from app.utils.database_utils import get_from_sheet
 from app.utils.imap_utils import create_inform_client_payment_reminder_email_body, create_inform_staff_reminder_report_email_body, send_email
+from app.extensions.executor import submit_with_app_context
 from flask import current_app
 from datetime import datetime, timedelta
 
@@ -7,6 +8,7 @@ def reminder_nonpaid_email() -> str:
     yesterday = (datetime.utcnow() - timedelta(days=1)).strftime('%Y-%m-%d')
     rows = get_from_sheet(match_column=["Paid", "Created_At"], match_value=["",yesterday])
     detail = []
+    futures = []
     try:
         for row in rows:
             email = row.get("Email")
@@ -26,19 +28,24 @@ def reminder_nonpaid_email() -> str:
 
             detail.append(info)
 
-            send_email(
+            # Reminders are independent SMTP sends, so dispatch them concurrently
+            futures.append(submit_with_app_context(
+                send_email,
                 subject=f"Payment Reminders for: {course} Course Registration",
                 recipients=[email],
                 body=create_inform_client_payment_reminder_email_body(info)
-            )
-            
-            last_info = detail[-1]
-            last_info["Notified"] = True
-            detail[-1] = last_info
+            ))
 
     except Exception as e:
         pass
     finally:
+        for info, future in zip(detail, futures):
+            try:
+                future.result()
+                info["Notified"] = True
+            except Exception:
+                pass
+
         if rows and len(rows) > 0:
             success_count = len([d for d in detail if d["Notified"]])
             fail_count = len(detail) - success_count
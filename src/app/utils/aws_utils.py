@@ -1,10 +1,34 @@
 from io import BytesIO
+from typing import Optional
 import boto3
 import cv2
 import numpy as np
 from PIL import Image
 from app.config.config import Config
 from app.utils.image_utils import image_preprocess
+
+# Formats Textract accepts as raw bytes, by their leading magic bytes
+_TEXTRACT_SIGNATURES = (b"\xff\xd8\xff", b"\x89PNG\r\n\x1a\n")
+# Textract's limit for synchronous, inline documents
+_TEXTRACT_MAX_BYTES = 10 * 1024 * 1024
+# EXIF tag holding the camera orientation; 1 means the pixels are upright
+_EXIF_ORIENTATION = 0x0112
+
+def _same_pixels(image_bytes: bytes, width: int, height: int) -> bool:
+    """
+    Check that `image_bytes` decode to a `width` x `height` image with no
+    EXIF rotation, i.e. that Textract would see the same pixels as the
+    decoded image. cv2 applies EXIF orientation on decode and the image
+    may have been downscaled since, so either makes the bytes differ.
+    Only the header is read.
+    """
+    try:
+        with Image.open(BytesIO(image_bytes)) as raw:
+            orientation = raw.getexif().get(_EXIF_ORIENTATION, 1)
+            return raw.size == (width, height) and orientation == 1
+    except Exception:
+        return False
+
 class AWSService:
     """
     AWS Service class to handle interactions with AWS services like S3 and AWS Textract.
@@ -130,37 +154,46 @@ class AWSService:
                     })
         return items
 
-    def extract_text_from_image(self, image):
+    def extract_text_from_image(self, image, image_bytes: Optional[bytes] = None):
         """
         Converts the image at image to text using aws textract.
         Args:
-            image: cv2 image.
+            image: cv2 or PIL image.
+            image_bytes: The encoded bytes `image` was decoded from. Sent to
+                Textract as-is when they are JPEG/PNG with the same size and
+                orientation as `image`, skipping a re-encode.
         Returns:
             list: List of detected text elements and corresponding normalized bounding boxes.
         """
 
         #image = image_preprocess(image)
-        image_width = image.shape[1]
-        image_height = image.shape[0]
+        if isinstance(image, Image.Image):
+            image_width, image_height = image.size
+        else:
+            image_height, image_width = image.shape[:2]
 
-        if isinstance(image, np.ndarray):
+        if image_bytes is not None and image_bytes.startswith(_TEXTRACT_SIGNATURES) \
+                and len(image_bytes) <= _TEXTRACT_MAX_BYTES \
+                and _same_pixels(image_bytes, image_width, image_height):
+            # Already JPEG/PNG and unchanged since decoding: send the original
+            # upload instead of re-encoding it, so the box coordinates still
+            # line up with image_width/image_height
+            document_bytes = image_bytes
+        elif isinstance(image, np.ndarray):
             image = np.ascontiguousarray(image)
             ok, buf = cv2.imencode('.jpg', image)
             if not ok:
                 raise RuntimeError("Failed to encode image for OCR API")
-            image_bytes = buf.tobytes()
-        elif isinstance(image, bytes):
-            image_bytes = image
+            document_bytes = buf.tobytes()
         elif isinstance(image, Image.Image):
             bio = BytesIO()
             image.save(bio, format='JPEG')
-            image_bytes = bio.getvalue()
+            document_bytes = bio.getvalue()
         else:
-            # fallback: try reading imgPath if provided
             raise RuntimeError("No image bytes available for OCR API call")
 
         response = self.textract.detect_document_text(
-            Document={'Bytes': image_bytes}
+            Document={'Bytes': document_bytes}
         )
         
         result = self.textract_to_items(response, image_width, image_height)
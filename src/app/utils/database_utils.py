@@ -1,12 +1,11 @@
 from flask import current_app
 from datetime import datetime
 import pandas as pd
-from datetime import datetime
 import os
 import json
 import numpy as np
 
-from app.utils.google_utils import append_record, update_record, find_records
+from app.utils.google_utils import append_record, update_record, find_records, filter_records
 
 def save_to_db(collection_name: str, data: dict) -> dict:
     """
@@ -287,4 +286,19 @@ def get_from_sheet(match_column: list[str], match_value:list):
         return match_rows
     except Exception as e:
         print(f"❌ Failed to retrieve record from Google Sheet: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def filter_sheet_rows(rows: list, match_column: list[str], match_value: list) -> list:
+    """
+    Narrow down rows already returned by get_from_sheet without reading the
+    Google Sheet again. Matching follows the same rules as get_from_sheet.
+
+    Args:
+        rows (list[dict]): Records returned by get_from_sheet.
+        match_column (list[str]): Column names to match (case-insensitive).
+        match_value (list): Values to match in the match_column.
+
+    Returns:
+        list[dict]: The rows that match.
+    """
+    return filter_records(rows, match_column, match_value)
\ No newline at end of file
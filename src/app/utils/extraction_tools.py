@@ -1,5 +1,8 @@
 import re
 
+_FORM_ID_RE = re.compile(r'/(\d+)')
+_DIGITS_RE = re.compile(r'\d+')
+
 def extract_form_id(slug):
     """
     Extracts form ID from the slug.
@@ -10,7 +13,7 @@ def extract_form_id(slug):
     Returns:
         str: Form ID or None.
     """
-    match = re.search(r'/(\d+)', slug)
+    match = _FORM_ID_RE.search(slug)
     return match.group(1) if match else None
 
 def extract_submission_id(file_upload_urls):
@@ -22,7 +25,7 @@ def extract_submission_id(file_upload_urls):
     """
     if file_upload_urls:
         file_upload_url = file_upload_urls[0]
-        matches = re.findall(r'\d+', file_upload_url)
+        matches = _DIGITS_RE.findall(file_upload_url)
         if len(matches) > 1:
             return matches[1]
     return None
\ No newline at end of file
@@ -1,6 +1,6 @@
 import json
 from datetime import datetime
-from typing import Any, Dict, List, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 import gspread
 from gspread.utils import rowcol_to_a1
 import numpy as np
@@ -38,30 +38,8 @@ def update_record(
     Returns:
         bool: True when an update occurs, False when no matching row is found.
     """
-    headers = headers
     header_map = _header_map(headers)
-
-    # normalize match_column and match_value to lists
-    if isinstance(match_column, str):
-        match_columns = [match_column]
-    else:
-        match_columns = list(match_column)
-
-    if not isinstance(match_value, list):
-        match_values = [match_value]
-    else:
-        match_values = list(match_value)
-
-    if len(match_columns) != len(match_values):
-        raise ValueError("match_column and match_value must have the same length")
-
-    # resolve target headers for each requested match column
-    target_headers: List[str] = []
-    for mc in match_columns:
-        th = header_map.get(mc.lower())
-        if th is None:
-            raise ValueError(f"Column '{mc}' does not exist in the Google Sheet.")
-        target_headers.append(th)
+    row_matches = _row_matcher(headers, match_column, match_value)
 
     values = sheet.get_all_values()
     if len(values) <= 1:
@@ -69,22 +47,7 @@ def update_record(
 
     # iterate rows and find the first row where all target columns match the corresponding values
     for row_offset, row in enumerate(values[1:], start=2):
-        all_match = True
-        for th, mv in zip(target_headers, match_values):
-            col_index = headers.index(th)
-            cell_value = row[col_index] if col_index < len(row) else ""
-
-            # treat empty/None match value as matching empty cells
-            if mv is None or str(mv).strip() == "":
-                if str(cell_value).strip() != "":
-                    all_match = False
-                    break
-            else:
-                if _normalize_string(cell_value) != _normalize_string(mv):
-                    all_match = False
-                    break
-
-        if not all_match:
+        if not row_matches(row):
             continue
 
         existing = _row_to_dict(headers, row)
@@ -125,7 +88,53 @@ def find_records(
     Returns:
         list[dict]: Matching rows converted into dictionaries.
     """
-    headers = headers
+    row_matches = _row_matcher(headers, match_column, match_value)
+
+    values = sheet.get_all_values()
+    if len(values) <= 1:
+        return []
+
+    return [_row_to_dict(headers, row) for row in values[1:] if row_matches(row)]
+
+
+def filter_records(
+    records: List[Dict[str, Any]],
+    match_column: Union[str, List[str]],
+    match_value: Union[Any, List[Any]],
+) -> List[Dict[str, Any]]:
+    """
+    Filter records already returned by find_records, using the same matching
+    rules, without reading the worksheet again.
+
+    Args:
+        records: Rows as dictionaries keyed by header.
+        match_column: Header (case-insensitive) used to filter rows.
+        match_value: Target value (case-insensitive, trimmed).
+
+    Returns:
+        list[dict]: The records that match.
+    """
+    if not records:
+        return []
+
+    headers = list(records[0].keys())
+    row_matches = _row_matcher(headers, match_column, match_value)
+
+    return [record for record in records if row_matches([record.get(h, "") for h in headers])]
+
+
+def _row_matcher(
+    headers: List[str],
+    match_column: Union[str, List[str]],
+    match_value: Union[Any, List[Any]],
+) -> Callable[[List[Any]], bool]:
+    """
+    Build a predicate telling whether a raw sheet row matches every
+    match_column/match_value pair (case-insensitive, trimmed).
+
+    Column positions and normalized match values are resolved once here
+    instead of for every row scanned.
+    """
     header_map = _header_map(headers)
 
     # normalize match_column and match_value to lists
@@ -142,40 +151,27 @@ def find_records(
     if len(match_columns) != len(match_values):
         raise ValueError("match_column and match_value must have the same length")
 
-    # resolve target headers for each requested match column
-    target_headers: List[str] = []
-    for mc in match_columns:
+    # resolve the column index and expected value for each requested match column
+    criteria: List[Tuple[int, Optional[str]]] = []
+    for mc, mv in zip(match_columns, match_values):
         th = header_map.get(mc.lower())
         if th is None:
             raise ValueError(f"Column '{mc}' does not exist in the Google Sheet.")
-        target_headers.append(th)
-
-    values = sheet.get_all_values()
-    if len(values) <= 1:
-        return []
-
-    matches: List[Dict[str, Any]] = []
+        # treat empty/None match value as matching empty cells
+        expected = None if mv is None or str(mv).strip() == "" else _normalize_string(mv)
+        criteria.append((headers.index(th), expected))
 
-    for row in values[1:]:
-        all_match = True
-        for th, mv in zip(target_headers, match_values):
-            col_index = headers.index(th)
+    def row_matches(row: List[Any]) -> bool:
+        for col_index, expected in criteria:
             cell_value = row[col_index] if col_index < len(row) else ""
-
-            # treat empty/None match value as matching empty cells
-            if mv is None or str(mv).strip() == "":
+            if expected is None:
                 if str(cell_value).strip() != "":
-                    all_match = False
-                    break
-            else:
-                if _normalize_string(cell_value) != _normalize_string(mv):
-                    all_match = False
-                    break
-
-        if all_match:
-            matches.append(_row_to_dict(headers, row))
+                    return False
+            elif _normalize_string(cell_value) != expected:
+                return False
+        return True
 
-    return matches
+    return row_matches
 
 
 def _header_map(headers: List[str]) -> Dict[str, str]:
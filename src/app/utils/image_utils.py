@@ -1,15 +1,61 @@
 from io import BytesIO
 from typing import Union, Optional
+from html.parser import HTMLParser
+from http.cookiejar import DefaultCookiePolicy
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from PIL import Image
 import cv2
 import pytesseract
-from io import BytesIO
 import numpy as np
 
 from app.config.config import Config
 
+class _FirstImgParser(HTMLParser):
+    """
+    Stops at the first <img> tag and keeps its attributes, like
+    BeautifulSoup's soup.find('img') with the same stdlib parser.
+    Comments are skipped and attribute values come back unescaped.
+    """
+
+    class Found(Exception):
+        pass
+
+    def __init__(self):
+        super().__init__()
+        self.img_attrs = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'img':
+            self.img_attrs = dict(attrs)
+            raise self.Found
+
+# Shared HTTP session so image downloads and OCR API calls reuse pooled
+# keep-alive connections instead of a new TLS handshake per request.
+# Only idempotent requests (GET) are retried, on failed connects and
+# transient server errors; a read timeout is raised at once rather than
+# retried. Cookies are refused so registrants' downloads share no state.
+_session = requests.Session()
+_session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=2,
+        read=False,
+        backoff_factor=0.3,
+        status_forcelist=(500, 502, 503, 504),
+        raise_on_status=False,
+    ),
+)
+_session.mount("https://", _adapter)
+_session.mount("http://", _adapter)
+
+# Longest side, in pixels, of images handed to OCR. Card text stays legible
+# well below this, while phone photos are often 3000-4000 px.
+MAX_OCR_DIMENSION = 2048
+
 def normalize(ocr_results, img_width: int, img_height: int) -> list:
     normalized_results = []
     for item in ocr_results:
@@ -38,6 +84,18 @@ def bytes_to_cv2(image_bytes: bytes) -> np.ndarray:
         img = cv2.cvtColor(np.array(pil), cv2.COLOR_RGB2BGR)
     return img
 
+def downscale(image: np.ndarray, max_dim: int = MAX_OCR_DIMENSION) -> np.ndarray:
+    """
+    Shrink an image so its longest side is at most `max_dim` pixels,
+    keeping the aspect ratio. Smaller images are returned unchanged.
+    """
+    height, width = image.shape[:2]
+    scale = max_dim / max(height, width)
+    if scale >= 1:
+        return image
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
 def get_image(source = 'URL', imgURL = None, imgPath = None):
     """
     Fetch image from URL or local path.
@@ -125,7 +183,7 @@ def ninja_image_to_text(image):
         'X-Api-Key': Config.NINJA_API_KEY
     }
 
-    r = requests.post(Config.NINJA_API_URL, files=files, headers=headers)
+    r = _session.post(Config.NINJA_API_URL, files=files, headers=headers)
     ocr_result = r.json()
 
     return ocr_result
@@ -143,10 +201,18 @@ def extract_image_url(html_content: Union[str, bytes]) ->  Optional[str]:
     Raises:
         ValueError: If no <img> tag with a `src` attribute is found.
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
-    img_tag = soup.find('img')
-    if img_tag and img_tag.get('src'):
-        return img_tag['src']
+    if isinstance(html_content, bytes):
+        html_content = html_content.decode('utf-8', errors='replace')
+
+    parser = _FirstImgParser()
+    try:
+        parser.feed(html_content)
+        parser.close()
+    except _FirstImgParser.Found:
+        pass
+
+    if parser.img_attrs and parser.img_attrs.get('src'):
+        return parser.img_attrs['src']
     raise ValueError("No image URL found in the provided HTML.")
 
 def fetch_image_bytes(image_url: str) -> bytes:
@@ -183,7 +249,7 @@ def fetch_image_bytes(image_url: str) -> bytes:
         )
     }
     try:
-        response = requests.get(full_url, headers=headers, timeout=15)
+        response = _session.get(full_url, headers=headers, timeout=15)
     except requests.RequestException as e:
         raise
     try:
@@ -204,13 +270,12 @@ def fetch_image_bytes(image_url: str) -> bytes:
             image_page_url = urljoin(image_url, image_page_url)
         return fetch_image_bytes(image_page_url)
 
-    # Some servers return image bytes without an image/ content-type; try to
-    # open with PIL as a last resort when status is 200.
+    # Some servers return image bytes without an image/ content-type; check
+    # with PIL as a last resort when status is 200. The bytes are returned
+    # unchanged since every consumer decodes them anyway.
     if response.status_code == 200:
-        image = Image.open(BytesIO(response.content))
-        buf = BytesIO()
-        image.save(buf, format='JPEG')
-        return buf.getvalue()
+        Image.open(BytesIO(response.content)).verify()
+        return response.content
 
     raise ValueError(f"Unable to handle content type: {content_type}")
 